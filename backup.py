@@ -0,0 +1,360 @@
+import sqlite3
+import time
+import os
+import gzip
+import shutil
+import random
+import statistics
+import threading
+import argparse
+import re
+import tempfile
+from datetime import datetime, timedelta
+from urllib.request import pathname2url
+from typing import List, Dict
+from database import create_tables, hash_password
+
+BACKUP_DIR = 'backups'
+# <database>-<YYYYmmdd-HHMMSS-ffffff>.db[.gz], as written by backup_database
+SNAPSHOT_NAME = re.compile(r"^(?P<database>.+)-(?P<stamp>\d{8}-\d{6}-\d{6})\.db(\.gz)?$")
+
+def _connect_existing(path: str, snapshot: bool = False, **kwargs) -> sqlite3.Connection:
+    # A plain connect() would silently create an empty database for a bad path
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"No such database: {path}")
+    if snapshot:
+        # Snapshots never change, and this stops SQLite writing -wal/-shm next to them
+        mode = "ro&immutable=1"
+    else:
+        # Read-write but never create. A read-only connection to a WAL database
+        # can't remove the -wal/-shm files it creates, so they would stay behind.
+        mode = "rw"
+    return sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode={mode}",
+                           uri=True, **kwargs)
+
+def backup_database(db_path: str = 'study_tracker.db', backup_dir: str = BACKUP_DIR,
+                    pages: int = 64, pause: float = 0.001, compress: bool = False,
+                    keep: int = None) -> Dict:
+    if keep is not None and keep < 1:
+        raise ValueError("keep must be at least 1")
+    os.makedirs(backup_dir, exist_ok=True)
+    src = _connect_existing(db_path, isolation_level=None)
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = os.path.join(backup_dir, f"{name}-{stamp}.db")
+    tmp_path = path + ".tmp"
+
+    step_times = []
+    last = [0.0]
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        step_times.append(now - last[0])
+        # Give writers a window between steps
+        time.sleep(pause)
+        last[0] = time.perf_counter()
+
+    try:
+        dst = sqlite3.connect(tmp_path)
+        # In WAL mode an open read transaction pins a consistent snapshot, so the
+        # copy never restarts and writers keep committing while we step through it
+        journal_mode = src.execute("PRAGMA journal_mode").fetchone()[0]
+        wal = journal_mode == 'wal'
+        if wal:
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        else:
+            # Without WAL every commit from another connection restarts a stepped
+            # copy, so a busy writer could keep it from ever finishing. Copy in
+            # one step instead; writers wait on the lock for that one step.
+            pages = -1
+
+        start = time.perf_counter()
+        # Time steps from here so setup doesn't count towards max_step
+        last[0] = start
+        try:
+            src.backup(dst, pages=pages, progress=progress)
+        finally:
+            if src.in_transaction:
+                src.execute("COMMIT")
+            dst.close()
+        duration = time.perf_counter() - start
+
+        if compress:
+            with open(tmp_path, 'rb') as f_in, gzip.open(tmp_path + ".gz", 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.remove(tmp_path)
+            path += ".gz"
+            tmp_path += ".gz"
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Never leave a partial snapshot behind
+        for leftover in (tmp_path, tmp_path + ".gz"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    finally:
+        src.close()
+
+    removed = rotate_backups(backup_dir, name, keep, protect=path) if keep is not None else []
+    return {
+        'path': path,
+        'size': os.path.getsize(path),
+        'duration': duration,
+        'steps': len(step_times),
+        'max_step': max(step_times, default=0.0),
+        'journal_mode': journal_mode,
+        'removed': removed
+    }
+
+def list_backups(backup_dir: str = BACKUP_DIR, database: str = None) -> List[Dict]:
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        # Skip anything that isn't one of our snapshots
+        match = SNAPSHOT_NAME.match(name)
+        if not match or (database is not None and match.group('database') != database):
+            continue
+        path = os.path.join(backup_dir, name)
+        backups.append({
+            'path': path,
+            'name': name,
+            'database': match.group('database'),
+            'size': os.path.getsize(path),
+            'created_at': datetime.strptime(match.group('stamp'), "%Y%m%d-%H%M%S-%f")
+        })
+    # Oldest first
+    backups.sort(key=lambda b: b['created_at'])
+    return backups
+
+def rotate_backups(backup_dir: str, database: str, keep: int = 5, protect: str = None) -> List[str]:
+    if keep < 1:
+        raise ValueError("keep must be at least 1")
+    backups = [b for b in list_backups(backup_dir, database) if b['path'] != protect]
+    # The protected snapshot counts towards the ones we keep
+    if protect is not None:
+        keep -= 1
+    removed = []
+    for backup in backups[:max(len(backups) - keep, 0)]:
+        os.remove(backup['path'])
+        removed.append(backup['path'])
+    return removed
+
+def restore_backup(snapshot_path: str, target_path: str) -> None:
+    if os.path.exists(target_path):
+        raise FileExistsError(f"Refusing to overwrite existing database: {target_path}")
+    if not os.path.isfile(snapshot_path):
+        raise FileNotFoundError(f"No such snapshot: {snapshot_path}")
+
+    tmp_path = target_path + ".tmp"
+    source_path = snapshot_path
+    try:
+        if snapshot_path.endswith(".gz"):
+            source_path = tmp_path + ".src"
+            with gzip.open(snapshot_path, 'rb') as f_in, open(source_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+
+        src = _connect_existing(source_path, snapshot=True)
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst)
+            result = dst.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            src.close()
+            dst.close()
+        if result != 'ok':
+            raise sqlite3.DatabaseError(f"Snapshot failed integrity check: {result}")
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        # Never leave a half-restored database behind
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if source_path != snapshot_path and os.path.exists(source_path):
+            os.remove(source_path)
+
+def create_fixture_db(path: str, users: int = 20, sessions_per_user: int = 50,
+                      groups: int = 5, seed: int = 0) -> str:
+    if os.path.exists(path):
+        raise FileExistsError(f"Refusing to overwrite existing database: {path}")
+
+    rng = random.Random(seed)
+    # Seed in memory, then write the whole file out in a single backup step
+    mem = sqlite3.connect(':memory:')
+    create_tables(mem)
+    c = mem.cursor()
+
+    password = hash_password("password")
+    c.executemany("INSERT INTO users (id, username, password, email) VALUES (?, ?, ?, ?)",
+                  [(i, f"user{i}", password, f"user{i}@example.com") for i in range(1, users + 1)])
+
+    now = datetime.now()
+    sessions = []
+    for user_id in range(1, users + 1):
+        for n in range(sessions_per_user):
+            start_time = now - timedelta(days=rng.randint(0, 60), seconds=rng.randint(0, 86400))
+            duration = rng.randint(5 * 60, 3 * 3600)
+            end_time = start_time + timedelta(seconds=duration)
+            sessions.append((user_id, f"Session {n + 1}", None,
+                             start_time.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                             end_time.strftime("%Y-%m-%d %H:%M:%S.%f"), duration))
+    c.executemany("""INSERT INTO study_sessions
+                     (user_id, title, description, start_time, end_time, duration)
+                     VALUES (?, ?, ?, ?, ?, ?)""", sessions)
+
+    members = []
+    # Groups need at least one user to own them
+    for group_id in range(1, (groups if users else 0) + 1):
+        created_by = rng.randint(1, users)
+        c.execute("INSERT INTO groups (id, name, description, created_by) VALUES (?, ?, ?, ?)",
+                  (group_id, f"Group {group_id}", None, created_by))
+        joined = {created_by} | set(rng.sample(range(1, users + 1), rng.randint(0, users)))
+        members.extend((group_id, user_id) for user_id in joined)
+    c.executemany("INSERT INTO group_members (group_id, user_id) VALUES (?, ?)", members)
+    mem.commit()
+
+    dst = sqlite3.connect(path)
+    mem.backup(dst)
+    dst.execute("PRAGMA journal_mode=WAL")
+    dst.close()
+    mem.close()
+    return path
+
+def _latency_stats(latencies: List[float]) -> Dict:
+    if not latencies:
+        return {'writes': 0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return {
+        'writes': len(latencies),
+        'p50': statistics.median(latencies),
+        'p95': p95,
+        'max': max(latencies)
+    }
+
+def measure_backup_impact(db_path: str, backup_dir: str, baseline_writes: int = 200,
+                          interval: float = 0.001, **backup_kwargs) -> Dict:
+    # Probe rows are inserted into db_path itself and deleted afterwards, but they
+    # still advance its AUTOINCREMENT counter and survive a killed process. Point
+    # this at a fixture database, not the live one. backup_dir has no default
+    # so a benchmark never rotates real backups away.
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(f"No such database: {db_path}")
+
+    def write_loop(latencies: List[float], stop: threading.Event, limit: int = None):
+        conn = sqlite3.connect(db_path)
+        try:
+            while not stop.is_set() and (limit is None or len(latencies) < limit):
+                t = time.perf_counter()
+                conn.execute("INSERT INTO study_sessions (user_id, title, start_time) VALUES (?, ?, ?)",
+                             (0, "latency probe", datetime.now()))
+                conn.commit()
+                latencies.append(time.perf_counter() - t)
+                time.sleep(interval)
+        finally:
+            conn.rollback()
+            conn.execute("DELETE FROM study_sessions WHERE user_id = 0 AND title = 'latency probe'")
+            conn.commit()
+            conn.close()
+
+    # Writer latency with nothing else running
+    baseline = []
+    write_loop(baseline, threading.Event(), baseline_writes)
+
+    # Same writer running for the whole duration of a snapshot
+    during = []
+    errors = []
+    stop = threading.Event()
+
+    def writer_thread():
+        try:
+            write_loop(during, stop)
+        except BaseException as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=writer_thread)
+    writer.start()
+    try:
+        backup = backup_database(db_path, backup_dir, **backup_kwargs)
+    finally:
+        stop.set()
+        writer.join()
+    # A failed writer means the latency numbers are meaningless
+    if errors:
+        raise errors[0]
+
+    return {
+        'backup': backup,
+        'baseline': _latency_stats(baseline),
+        'during_backup': _latency_stats(during)
+    }
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
+
+def main():
+    parser = argparse.ArgumentParser(description="Study Tracker database backups")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('create', help="take an online snapshot")
+    p.add_argument('--db', default='study_tracker.db')
+    p.add_argument('--dir', default=BACKUP_DIR)
+    p.add_argument('--pages', type=int, default=64)
+    p.add_argument('--compress', action='store_true')
+    p.add_argument('--keep', type=_positive_int)
+
+    p = sub.add_parser('list', help="list snapshots")
+    p.add_argument('--dir', default=BACKUP_DIR)
+
+    p = sub.add_parser('restore', help="restore a snapshot into a new file")
+    p.add_argument('snapshot')
+    p.add_argument('target')
+
+    p = sub.add_parser('fixture', help="create a seeded database")
+    p.add_argument('path')
+    p.add_argument('--users', type=int, default=20)
+    p.add_argument('--sessions', type=int, default=50)
+    p.add_argument('--groups', type=int, default=5)
+    p.add_argument('--seed', type=int, default=0)
+
+    p = sub.add_parser('bench', help="measure writer latency during a snapshot of a fixture database")
+    p.add_argument('--db', help="benchmark this database instead; probe rows are written into it")
+    p.add_argument('--dir', help="snapshot directory (default: a temporary directory)")
+    p.add_argument('--users', type=int, default=200)
+    p.add_argument('--sessions', type=int, default=200)
+    p.add_argument('--pages', type=int, default=64)
+
+    args = parser.parse_args()
+    if args.command == 'create':
+        result = backup_database(args.db, args.dir, pages=args.pages,
+                                 compress=args.compress, keep=args.keep)
+        print(f"{result['path']} ({result['size']} bytes) in {result['duration']:.3f}s, "
+              f"{result['steps']} steps, longest {result['max_step'] * 1000:.1f}ms")
+    elif args.command == 'list':
+        for backup in list_backups(args.dir):
+            print(f"{backup['name']}\t{backup['size']}\t{backup['created_at']:%Y-%m-%d %H:%M:%S}")
+    elif args.command == 'restore':
+        restore_backup(args.snapshot, args.target)
+        print(f"Restored {args.snapshot} to {args.target}")
+    elif args.command == 'fixture':
+        create_fixture_db(args.path, args.users, args.sessions, args.groups, args.seed)
+        print(f"Created {args.path}")
+    elif args.command == 'bench':
+        with tempfile.TemporaryDirectory() as scratch:
+            db_path = args.db or create_fixture_db(os.path.join(scratch, 'bench.db'),
+                                                   args.users, args.sessions)
+            result = measure_backup_impact(db_path, args.dir or os.path.join(scratch, 'backups'),
+                                           pages=args.pages)
+        print(f"snapshot: {result['backup']['duration']:.3f}s, "
+              f"longest step {result['backup']['max_step'] * 1000:.1f}ms")
+        for label in ('baseline', 'during_backup'):
+            stats = result[label]
+            print(f"{label}: {stats['writes']} writes, p50 {stats['p50'] * 1000:.2f}ms, "
+                  f"p95 {stats['p95'] * 1000:.2f}ms, max {stats['max'] * 1000:.2f}ms")
+
+if __name__ == "__main__":
+    main()
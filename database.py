@@ -0,0 +1,47 @@
+import sqlite3
+import hashlib
+
+def create_tables(conn: sqlite3.Connection) -> None:
+    c = conn.cursor()
+    
+    # Users table
+    c.execute('''CREATE TABLE IF NOT EXISTS users
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  username TEXT UNIQUE NOT NULL,
+                  password TEXT NOT NULL,
+                  email TEXT,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    
+    # Study sessions table
+    c.execute('''CREATE TABLE IF NOT EXISTS study_sessions
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  user_id INTEGER NOT NULL,
+                  title TEXT NOT NULL,
+                  description TEXT,
+                  start_time TIMESTAMP NOT NULL,
+                  end_time TIMESTAMP,
+                  duration INTEGER,
+                  FOREIGN KEY (user_id) REFERENCES users (id))''')
+    
+    # Groups table
+    c.execute('''CREATE TABLE IF NOT EXISTS groups
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  name TEXT NOT NULL,
+                  description TEXT,
+                  created_by INTEGER NOT NULL,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                  FOREIGN KEY (created_by) REFERENCES users (id))''')
+    
+    # Group members table
+    c.execute('''CREATE TABLE IF NOT EXISTS group_members
+                 (group_id INTEGER NOT NULL,
+                  user_id INTEGER NOT NULL,
+                  joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                  PRIMARY KEY (group_id, user_id),
+                  FOREIGN KEY (group_id) REFERENCES groups (id),
+                  FOREIGN KEY (user_id) REFERENCES users (id))''')
+    
+    conn.commit()
+
+def hash_password(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from backup import (backup_database, create_fixture_db, list_backups,
+                    measure_backup_impact, restore_backup)
+
+
+def count_sessions(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM study_sessions").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def fixture_db(tmp_path):
+    return create_fixture_db(str(tmp_path / "study.db"), users=10, sessions_per_user=20)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_backup_restore_round_trip(tmp_path, fixture_db, compress):
+    backup_dir = str(tmp_path / "backups")
+    result = backup_database(fixture_db, backup_dir, pages=4, compress=compress)
+
+    assert result['path'].endswith(".db.gz" if compress else ".db")
+    assert result['steps'] > 1
+    assert os.listdir(backup_dir) == [os.path.basename(result['path'])]
+
+    target = str(tmp_path / "restored.db")
+    restore_backup(result['path'], target)
+    assert count_sessions(target) == 200
+    # Restoring must not leave journal files next to the snapshot
+    assert os.listdir(backup_dir) == [os.path.basename(result['path'])]
+
+
+def test_restore_refuses_existing_target(tmp_path, fixture_db):
+    snapshot = backup_database(fixture_db, str(tmp_path / "backups"))['path']
+    with pytest.raises(FileExistsError):
+        restore_backup(snapshot, fixture_db)
+
+
+def test_rotation_only_touches_own_snapshots(tmp_path):
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    (backup_dir / "unrelated.db").write_bytes(b"")
+    zzz = create_fixture_db(str(tmp_path / "zzz.db"), users=2)
+    aaa = create_fixture_db(str(tmp_path / "aaa.db"), users=2)
+
+    other = backup_database(zzz, str(backup_dir))['path']
+    for _ in range(3):
+        result = backup_database(aaa, str(backup_dir), keep=1)
+
+    assert len(result['removed']) == 1
+    assert os.path.exists(result['path'])
+    assert os.path.exists(other)
+    assert (backup_dir / "unrelated.db").exists()
+    assert [b['path'] for b in list_backups(str(backup_dir), 'aaa')] == [result['path']]
+
+
+def test_missing_source_is_not_created(tmp_path):
+    missing = str(tmp_path / "missing.db")
+    target = str(tmp_path / "target.db")
+
+    with pytest.raises(FileNotFoundError):
+        backup_database(missing, str(tmp_path / "backups"))
+    with pytest.raises(FileNotFoundError):
+        restore_backup(missing, target)
+
+    assert not os.path.exists(missing)
+    assert not os.path.exists(target)
+
+
+@pytest.mark.parametrize("name", ["corrupt.db", "corrupt.db.gz"])
+def test_restore_rejects_corrupt_snapshot(tmp_path, name):
+    snapshot = tmp_path / name
+    snapshot.write_bytes(b"not a database" * 100)
+
+    with pytest.raises((sqlite3.DatabaseError, OSError)):
+        restore_backup(str(snapshot), str(tmp_path / "target.db"))
+
+    assert sorted(os.listdir(tmp_path)) == [name]
+
+
+@pytest.mark.parametrize("journal_mode", ["wal", "delete"])
+def test_backup_finishes_with_active_writer(tmp_path, journal_mode):
+    db_path = create_fixture_db(str(tmp_path / "study.db"), users=20, sessions_per_user=100)
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.close()
+
+    stop = threading.Event()
+    writes = []
+
+    def writer():
+        conn = sqlite3.connect(db_path)
+        while not stop.is_set():
+            conn.execute("INSERT INTO study_sessions (user_id, title, start_time) VALUES (?, ?, ?)",
+                         (1, "writer", "2024-01-01 00:00:00.000000"))
+            conn.commit()
+            writes.append(1)
+            time.sleep(0.001)
+        conn.close()
+
+    results = []
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        # Run the backup in its own thread so a livelock fails instead of hanging
+        backup = threading.Thread(
+            target=lambda: results.append(backup_database(db_path, str(tmp_path / "backups"), pages=4)))
+        backup.start()
+        backup.join(timeout=30)
+        assert not backup.is_alive()
+    finally:
+        stop.set()
+        thread.join()
+
+    assert writes
+    assert results[0]['journal_mode'] == journal_mode
+    restore_backup(results[0]['path'], str(tmp_path / "restored.db"))
+    assert count_sessions(str(tmp_path / "restored.db")) >= 2000
+
+
+def test_measure_backup_impact_cleans_up_probes(tmp_path, fixture_db):
+    result = measure_backup_impact(fixture_db, str(tmp_path / "bench"), baseline_writes=20)
+
+    assert result['baseline']['writes'] == 20
+    assert result['backup']['duration'] > 0
+    assert count_sessions(fixture_db) == 200
+
+
+@pytest.mark.parametrize("keep", [0, -1])
+def test_backup_rejects_keep_below_one(tmp_path, fixture_db, keep):
+    backup_dir = tmp_path / "backups"
+    with pytest.raises(ValueError):
+        backup_database(fixture_db, str(backup_dir), keep=keep)
+    assert not backup_dir.exists()
+
+
+def test_backup_leaves_no_journal_files_next_to_source(tmp_path, fixture_db):
+    backup_database(fixture_db, str(tmp_path / "backups"))
+    assert sorted(os.listdir(tmp_path)) == ["backups", "study.db"]